@@ -6,10 +6,23 @@ import sys
 import time
 import subprocess
 import json
-from typing import Tuple
+import math
+import hashlib
+import re
+import functools
+import errno
+import fcntl
+import termios
+import socket
+import struct
+import threading
+import http.server
+import concurrent.futures
+from contextlib import contextmanager
+from typing import Tuple, Iterable, Iterator, Optional
 import gi
 import dbus
-from dbus.mainloop.glib import DBusGMainLoop
+from dbus.mainloop.glib import DBusGMainLoop, threads_init
 
 gi.require_version("Gtk", "3.0")                # pylint: disable=wrong-import-position
 from gi.repository import Gtk, Gdk, GLib, Gio   # pylint: enable=wrong-import-position
@@ -19,6 +32,420 @@ from openvpn3.constants import StatusMajor, StatusMinor
 
 MAX_LOG_SIZE = 5*1024*1024                      # 5MB
 
+# Optional Prometheus exporter. Set either (or both) variables to enable it:
+#   OVPN3GUI_METRICS_FILE - path for the node_exporter textfile collector
+#   OVPN3GUI_METRICS_PORT - port of the HTTP endpoint on 127.0.0.1
+METRICS_FILE_ENV = "OVPN3GUI_METRICS_FILE"
+METRICS_PORT_ENV = "OVPN3GUI_METRICS_PORT"
+METRICS_REFRESH_SECONDS = 15
+
+# Optional directory with profiles pushed by config management. Its *.ovpn files
+# are kept in sync with the configuration manager.
+PROFILE_DIR_ENV = "OVPN3GUI_PROFILE_DIR"
+PROFILE_DIR_SYNC_DELAY_MS = 500
+
+RECONCILE_RETRY_INTERVAL = 10                   # Seconds between attempts to reach the backend
+SESSION_GC_INTERVAL = 300                       # Seconds between session cleanups
+SESSION_GC_TIMEOUT = 10                         # Seconds to wait for a single session
+SESSION_GC_WORKERS = 8
+
+NETWORK_CHANGE_DELAY_MS = 2000                  # Wait for the network to settle
+NETWORK_RESTART_COOLDOWN = 15                   # Seconds to ignore changes after a restart
+
+# Tunnel self-test endpoint, "host:port" reachable through the VPN. It has to run
+# a TCP sink (e.g. discard service) and a UDP echo (e.g. echo service) on that port.
+SELFTEST_ENDPOINT_ENV = "OVPN3GUI_SELFTEST_ENDPOINT"
+SELFTEST_DURATION = 5                           # Seconds of bulk transfer at most
+SELFTEST_MAX_BYTES = 100*1024*1024
+SELFTEST_BUFFER_SIZE = 256*1024
+SELFTEST_PROBES = 20
+SELFTEST_PROBE_TIMEOUT = 1.0
+SELFTEST_DRAIN_TIMEOUT = 5.0                    # Seconds to wait for the sent data to be acked
+SIOCGIFADDR = 0x8915
+
+# Parsing of the log written by "openvpn3 log". Lines look like:
+#   Thu Oct 19 10:00:00 2023 [group] LEVEL: message
+# where the group and level are optional. Everything is done with generators
+# one line at a time, so memory usage does not depend on the log size.
+LOG_LINE_RE = re.compile(r"^(?P<ts>\w{3} \w{3}\s+\d{1,2} \d{2}:\d{2}:\d{2} \d{4})"
+                         r"\s+(?P<rest>.*)$")
+LOG_CATEGORY_RE = re.compile(r"^\[(?P<category>[^\]]+)\]\s*")
+LOG_LEVEL_RE = re.compile(r"^(?P<level>DEBUG|VERB1|VERB2|INFO|WARNING|WARN|"
+                          r"ERROR|CRITICAL|CRIT|FATAL):?\s+")
+LOG_SESSION_RE = re.compile(r"/net/openvpn/v3/sessions/\w+")
+LOG_MARKER_CATEGORY = "ovpn3gui"
+
+# Connection phases in the order they happen. A phase ends when one of its
+# markers (lowercase substrings) is seen in the log. The markers follow what
+# the openvpn3 core logs during a connect:
+#   Contacting 1.2.3.4:1194 via UDP                     - host name resolved
+#   Connecting to [vpn.example.com]:1194 (1.2.3.4) via UDPv4 - transport connected
+#   SSL Handshake: peer certificate: ...                - TLS done
+#   Session is ACTIVE                                   - control channel up
+#   Sending PUSH_REQUEST to server... / PUSH_REPLY      - authenticated, options pushed
+#   EVENT: CONNECTED / Client connected                 - tunnel up
+CONNECT_PHASES = (
+    ("dns",     ("contacting ",)),
+    ("connect", ("connecting to [",)),
+    ("tls",     ("ssl handshake", "tls handshake")),
+    ("auth",    ("push_reply",)),
+    ("tunnel",  ("event: connected", "client connected")),
+)
+ATTEMPT_START_MARKERS = ("starting session /", "event: reconnecting")
+ATTEMPT_FAILURE_MARKERS = ("auth_failed", "authentication failed",
+                           "connection failed", "fatal error")
+
+@functools.lru_cache(maxsize=1024)
+def _parse_log_timestamp(ts: str) -> Optional[float]:
+    """ strptime() is the main cost of parsing, and consecutive
+        lines mostly share the timestamp, so the results are cached.
+    """
+    try:
+        return time.mktime(time.strptime(" ".join(ts.split()), "%a %b %d %H:%M:%S %Y"))
+    except ValueError:
+        return None
+
+def parse_log_events(filenames: Iterable[str]) -> Iterator[dict]:
+    """ Turn openvpn3 log files into structured events. The files must be given
+        oldest first. Lines without a timestamp inherit the previous one.
+    """
+    timestamp = None
+    session_path = None
+    for filename in filenames:
+        with open(filename, 'r', encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.rstrip()
+                if not line:
+                    continue
+                m = LOG_LINE_RE.match(line)
+                if m:
+                    timestamp = _parse_log_timestamp(m["ts"]) or timestamp
+                    line = m["rest"]
+                category = ""
+                m = LOG_CATEGORY_RE.match(line)
+                if m:
+                    category = m["category"]
+                    line = line[m.end():]
+                level = "INFO"
+                m = LOG_LEVEL_RE.match(line)
+                if m:
+                    level = m["level"]
+                    line = line[m.end():]
+                m = LOG_SESSION_RE.search(line)
+                if m:
+                    session_path = m.group(0)
+                yield { "timestamp":    timestamp,
+                        "session_path": session_path,
+                        "level":        level,
+                        "category":     category,
+                        "message":      line }
+
+def connect_timelines(events: Iterable[dict]) -> Iterator[dict]:
+    """ Group log events into connection attempts and compute how long each
+        connection phase took. Only the current attempt is kept in memory.
+    """
+    attempt = None
+
+    def finish(result: str, message: Optional[str] = None, ended: Optional[float] = None) -> dict:
+        marks = attempt.pop("marks")
+        prev = attempt["started"]
+        for name, _ in CONNECT_PHASES:
+            if name in marks and prev is not None:
+                attempt["phases"][name] = marks[name] - prev
+                prev = marks[name]
+        ended = ended if ended is not None else prev
+        if ended is not None and attempt["started"] is not None:
+            attempt["total"] = ended - attempt["started"]
+        attempt["result"] = result
+        attempt["message"] = message
+        return attempt
+
+    for e in events:
+        msg = e["message"].lower()
+        starts = msg.startswith(ATTEMPT_START_MARKERS)
+        if starts and attempt is not None:
+            yield finish("incomplete")
+            attempt = None
+        if attempt is None:
+            # Events outside of an attempt are only interesting if they begin one
+            if not starts and not any(m in msg for _, markers in CONNECT_PHASES for m in markers):
+                continue
+            attempt = { "session_path": e["session_path"],
+                        "started":      e["timestamp"],
+                        "phases":       {},
+                        "total":        None,
+                        "marks":        {} }
+            if starts:
+                continue
+        if attempt["session_path"] is None:
+            attempt["session_path"] = e["session_path"]
+        if any(m in msg for m in ATTEMPT_FAILURE_MARKERS):
+            yield finish("failed", e["message"], e["timestamp"])
+            attempt = None
+            continue
+        for name, markers in CONNECT_PHASES:
+            if name not in attempt["marks"] and any(m in msg for m in markers):
+                attempt["marks"][name] = e["timestamp"]
+                break
+        if "tunnel" in attempt["marks"]:
+            yield finish("connected")
+            attempt = None
+
+    if attempt is not None:
+        yield finish("incomplete")
+
+def format_timeline(t: dict) -> str:
+    """ Human readable one-entry summary of a connection attempt. """
+    started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t["started"])) \
+              if t["started"] is not None else "unknown time"
+    text = f"{started}  {t['result']}  {t['session_path'] or ''}\n   "
+    for name, _ in CONNECT_PHASES:
+        d = t["phases"].get(name)
+        text += f" {name}: " + (f"{d:.0f}s" if d is not None else "-")
+    if t["total"] is not None:
+        text += f"  total: {t['total']:.0f}s"
+    if t["message"]:
+        text += "\n    " + t["message"]
+    return text + "\n"
+
+METRIC_TYPES = {
+    "ovpn3gui_session_connected":
+        ("gauge", "1 if the session is connected"),
+    "ovpn3gui_session_status":
+        ("gauge", "Status of the session as reported by the backend"),
+    "ovpn3gui_session_bytes_in":
+        ("gauge", "Bytes received by the session"),
+    "ovpn3gui_session_bytes_out":
+        ("gauge", "Bytes sent by the session"),
+    "ovpn3gui_connect_attempts_total":
+        ("counter", "Connection attempts by result"),
+    "ovpn3gui_connect_duration_seconds":
+        ("summary", "Time from submitting credentials to the result"),
+    "ovpn3gui_dbus_calls_total":
+        ("counter", "D-Bus calls made by the application"),
+    "ovpn3gui_dbus_call_duration_seconds":
+        ("summary", "Duration of D-Bus calls"),
+    "ovpn3gui_redraw_duration_seconds":
+        ("summary", "Duration of main window redraws"),
+    "ovpn3gui_sessions_cleaned_total":
+        ("counter", "Sessions disconnected by the session cleanup"),
+    "ovpn3gui_network_restarts_total":
+        ("counter", "Session restarts caused by network changes"),
+}
+
+class Metrics:
+    """ Application performance counters in Prometheus text format.
+        The values are recorded by the application as it goes, so rendering
+        never talks to the backend. Rendering may happen in the HTTP thread.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.__lock = threading.Lock()
+        self.__values = {}      # (name, labels) -> value
+
+    @staticmethod
+    def __key(name: str, labels: Optional[dict]) -> tuple:
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name: str, labels: Optional[dict] = None, value: float = 1):
+        key = self.__key(name, labels)
+        with self.__lock:
+            self.__values[key] = self.__values.get(key, 0) + value
+
+    def set(self, name: str, value: float, labels: Optional[dict] = None):
+        with self.__lock:
+            self.__values[self.__key(name, labels)] = value
+
+    def observe(self, name: str, seconds: float, labels: Optional[dict] = None):
+        self.inc(name + "_count", labels)
+        self.inc(name + "_sum", labels, seconds)
+
+    def clear(self, prefix: str):
+        """ Forget all series of the metrics starting with prefix,
+            e.g. sessions that do not exist anymore.
+        """
+        with self.__lock:
+            for key in [k for k in self.__values if k[0].startswith(prefix)]:
+                del self.__values[key]
+
+    @contextmanager
+    def dbus_call(self, method: str):
+        """ Count and time a D-Bus call made inside the with-block. """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.inc("ovpn3gui_dbus_calls_total", {"method": method})
+            self.observe("ovpn3gui_dbus_call_duration_seconds",
+                         time.monotonic() - start, {"method": method})
+
+    def render(self) -> str:
+        with self.__lock:
+            values = sorted(self.__values.items())
+        lines = []
+        for name, (mtype, mhelp) in METRIC_TYPES.items():
+            lines.append(f"# HELP {name} {mhelp}")
+            lines.append(f"# TYPE {name} {mtype}")
+            for (series, labels), value in values:
+                if series != name and series not in (name + "_count", name + "_sum"):
+                    continue
+                lbl = ",".join(f'{k}="{self.__escape(v)}"' for k, v in labels)
+                lines.append(f"{series}{{{lbl}}} {value}" if lbl else f"{series} {value}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def __escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    def write_textfile(self, filename: str):
+        """ Atomically replace the textfile collector file. """
+        tmp_filename = filename + ".tmp"
+        with open(tmp_filename, 'w', encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_filename, filename)
+
+    def serve(self, port: int):
+        """ Serve the metrics over HTTP on the loopback interface only. """
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):                   # pylint: disable=invalid-name
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):       # pylint: disable=arguments-differ
+                pass
+
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+METRICS = Metrics()
+
+def is_valid_profile(text: str) -> bool:
+    """ Sanity check of the OpenVPN profile. """
+    # OpenVPN3 does not perform any profile validation and allows
+    # to import arbitrary data, so we have to do some minimal check
+    return "remote" in text
+
+def percentile(values: list, p: float) -> Optional[float]:
+    """ Nearest-rank percentile of the values. """
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, min(len(values) - 1, math.ceil(p / 100 * len(values)) - 1))]
+
+def interface_address(device: str, family: int) -> str:
+    """ Returns the local address of the network interface. """
+    if family == socket.AF_INET:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            ifreq = fcntl.ioctl(sock.fileno(), SIOCGIFADDR,
+                                struct.pack("256s", device.encode()[:15]))
+        return socket.inet_ntoa(ifreq[20:24])
+    # address, index, prefix length, scope, flags, name
+    with open("/proc/net/if_inet6", encoding="ascii") as f:
+        for line in f:
+            address, _, _, scope, _, name = line.split()
+            if name == device and scope == "00":
+                return ":".join(address[i:i + 4] for i in range(0, 32, 4))
+    raise OSError(errno.EADDRNOTAVAIL, "No address on " + device)
+
+def tunnel_socket(host: str, port: int, sock_type: int, device: str) -> socket.socket:
+    """ Returns a socket connected to the endpoint through the tunnel device,
+        so that a route outside the tunnel does not skew the results.
+    """
+    family, _, _, _, addr = socket.getaddrinfo(host, port, type=sock_type)[0]
+    sock = socket.socket(family, sock_type)
+    try:
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BINDTODEVICE, device.encode())
+        except PermissionError:
+            # Needs CAP_NET_RAW before Linux 5.7, the tunnel address will do
+            sock.bind((interface_address(device, family), 0))
+        sock.settimeout(SELFTEST_PROBE_TIMEOUT * 5)
+        sock.connect(addr)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+def measure_throughput(host: str, port: int, device: str, duration: float = SELFTEST_DURATION,
+                       max_bytes: int = SELFTEST_MAX_BYTES) -> Tuple[int, float]:
+    """ Send bulk data to a TCP sink for a bounded time and amount.
+        The same buffer is sent over and over through a memoryview,
+        so no data is copied in user space. Only the data acked by the sink
+        counts, not what is still sitting in the send buffer.
+        Returns (bytes, seconds).
+    """
+    view = memoryview(bytearray(SELFTEST_BUFFER_SIZE))
+    sent = 0
+    with tunnel_socket(host, port, socket.SOCK_STREAM, device) as sock:
+        start = time.monotonic()
+        deadline = start + duration
+        while sent < max_bytes and time.monotonic() < deadline:
+            sent += sock.send(view[:min(len(view), max_bytes - sent)])
+        # Wait for the send buffer to drain, SIOCOUTQ counts unacked bytes
+        unacked = struct.unpack("i", fcntl.ioctl(sock.fileno(), termios.TIOCOUTQ, b"\0" * 4))[0]
+        drain_deadline = time.monotonic() + SELFTEST_DRAIN_TIMEOUT
+        while unacked > 0 and time.monotonic() < drain_deadline:
+            time.sleep(0.01)
+            unacked = struct.unpack("i", fcntl.ioctl(sock.fileno(), termios.TIOCOUTQ,
+                                                     b"\0" * 4))[0]
+        elapsed = time.monotonic() - start
+    return sent - unacked, elapsed
+
+def measure_rtt(host: str, port: int, device: str, probes: int = SELFTEST_PROBES,
+                timeout: float = SELFTEST_PROBE_TIMEOUT) -> Tuple[list, int]:
+    """ Send numbered probes to a UDP echo service one by one.
+        Returns (round trip times in seconds, number of lost probes).
+    """
+    rtts = []
+    with tunnel_socket(host, port, socket.SOCK_DGRAM, device) as sock:
+        for seq in range(probes):
+            start = time.monotonic()
+            sock.send(struct.pack("!I", seq) + b"ovpn3gui")
+            while True:
+                left = start + timeout - time.monotonic()
+                if left <= 0:
+                    break
+                sock.settimeout(left)
+                try:
+                    reply = sock.recv(64)
+                except socket.timeout:
+                    break
+                # Late replies to earlier probes are ignored
+                if reply[:4] == struct.pack("!I", seq):
+                    rtts.append(time.monotonic() - start)
+                    break
+    return rtts, probes - len(rtts)
+
+def run_selftest(host: str, port: int, device: str) -> dict:
+    """ Measure throughput, round trip time and loss towards the endpoint
+        through the tunnel device.
+    """
+    rtts, lost = measure_rtt(host, port, device)
+    sent, elapsed = measure_throughput(host, port, device)
+    return { "mbit_s":     sent * 8 / elapsed / 1e6 if elapsed > 0 else 0.0,
+             "bytes":      sent,
+             "rtt_p50_ms": percentile([r * 1000 for r in rtts], 50),
+             "rtt_p90_ms": percentile([r * 1000 for r in rtts], 90),
+             "rtt_p99_ms": percentile([r * 1000 for r in rtts], 99),
+             "loss":       lost / SELFTEST_PROBES }
+
+def format_selftest(r: dict) -> str:
+    text = f"{r['mbit_s']:.1f} Mbit/s"
+    if r["rtt_p50_ms"] is not None:
+        text += (f", RTT p50/p90/p99 {r['rtt_p50_ms']:.1f}/{r['rtt_p90_ms']:.1f}/"
+                 f"{r['rtt_p99_ms']:.1f} ms")
+    return text + f", loss {r['loss']:.0%}"
+
 class PersistentDict:
     """ Persistent storage to save username per connection.
         Implemented as JSON file.
@@ -35,6 +462,15 @@ class PersistentDict:
         self.__data[index] = value
         self.__store()
 
+    def items(self):
+        return self.__data.items()
+
+    def replace(self, data: dict):
+        """ Replace the whole contents, storing it only once. """
+        if data != self.__data:
+            self.__data = data
+            self.__store()
+
     def __load(self):
         if os.path.exists(self.__filename):
             with open(self.__filename, 'r', encoding="utf-8") as f:
@@ -44,6 +480,397 @@ class PersistentDict:
         with open(self.__filename, 'w', encoding="utf-8") as f:
             json.dump(self.__data, f, indent=4)
 
+class ProfileDirSync:
+    """ Keeps *.ovpn profiles from a directory imported into the configuration
+        manager: new files are imported, changed files replaced and deleted
+        files removed. The state (file stat, content hash and config path) is
+        saved persistently, so unchanged files are never re-imported and are
+        not even read as long as their size and mtime stay the same.
+    """
+    def __init__(self, directory: str, state: PersistentDict):
+        self.directory = directory
+        self.__state = state
+        self.__monitor = None
+        self.__timeout_id = None
+
+    def __scan(self) -> Optional[dict]:
+        """ Returns {filename: stat} of the profiles in the directory,
+            or None if the directory does not exist.
+        """
+        files = {}
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".ovpn") and entry.is_file():
+                        st = entry.stat()
+                        files[entry.path] = [st.st_size, st.st_mtime_ns]
+        except FileNotFoundError:
+            return None
+        return files
+
+    def sync(self, cmgr: openvpn3.ConfigurationManager) -> bool:
+        """ Bring the configuration manager in line with the directory.
+            Returns True if any profile was imported, replaced or removed.
+        """
+        files = self.__scan()
+        if files is None:
+            # Unmounted share, directory being redeployed or a typo. Don't take
+            # it as if all the profiles had been deleted.
+            print("Profile directory", self.directory, "does not exist, skipping sync")
+            return False
+        old_state = dict(self.__state.items())
+        new_state = {}
+        changed = False
+        for filename, stat in files.items():
+            entry = old_state.pop(filename, None)
+            if entry and entry["stat"] == stat:
+                new_state[filename] = entry
+                continue
+            try:
+                with open(filename, 'rb') as f:
+                    data = f.read()
+            except OSError as e:
+                print("Failed to read profile", filename, e)
+                if entry:
+                    # Keep tracking the imported config, it is retried next time
+                    new_state[filename] = entry
+                continue
+            digest = hashlib.sha256(data).hexdigest()
+            if entry and entry["hash"] == digest:
+                # Touched, but not modified
+                new_state[filename] = dict(entry, stat=stat)
+                continue
+            text = data.decode("utf-8", errors="replace")
+            if not is_valid_profile(text):
+                print("Skipping invalid profile", filename)
+                if entry:
+                    # Keep the last valid version imported and tracked
+                    new_state[filename] = entry
+                continue
+            if entry:
+                self.__remove_config(cmgr, entry["config_path"])
+            profile_name = os.path.splitext(os.path.basename(filename))[0]
+            changed = True
+            try:
+                cfg = cmgr.Import(profile_name, text, False, True)
+            except dbus.exceptions.DBusException as e:
+                # Not recorded in the state, so it is retried on the next sync
+                print("Failed to import profile", filename, e.get_dbus_message())
+                continue
+            print("Imported profile", filename)
+            new_state[filename] = {"stat": stat, "hash": digest, "config_path": cfg.GetPath()}
+
+        # Whatever is left in the old state was deleted from the directory
+        for filename, entry in old_state.items():
+            print("Removing profile", filename)
+            self.__remove_config(cmgr, entry["config_path"])
+            changed = True
+
+        self.__state.replace(new_state)
+        return changed
+
+    @staticmethod
+    def __remove_config(cmgr: openvpn3.ConfigurationManager, config_path: str):
+        try:
+            cmgr.Retrieve(config_path).Remove()
+        except dbus.exceptions.DBusException as e:
+            # The user may have deleted the profile already
+            print("Failed to remove config", config_path, e.get_dbus_message())
+
+    def watch(self, callback):
+        """ Call callback() when the directory contents change.
+            Bursts of events are coalesced into a single call.
+        """
+        directory = Gio.File.new_for_path(self.directory)
+        self.__monitor = directory.monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES, None)
+        self.__monitor.connect("changed", self.__on_changed, callback)
+
+    def __on_changed(self, _monitor: Gio.FileMonitor, _file: Gio.File,
+                     _other_file: Gio.File, _event: Gio.FileMonitorEvent, callback):
+        if self.__timeout_id is not None:
+            GLib.source_remove(self.__timeout_id)
+        self.__timeout_id = GLib.timeout_add(PROFILE_DIR_SYNC_DELAY_MS,
+                                             self.__on_settled, callback)
+
+    def __on_settled(self, callback) -> bool:
+        self.__timeout_id = None
+        callback()
+        return False
+
+class SessionCollector:
+    """ Disconnects lingering sessions in worker threads, so that a backend
+        with lots of leftovers does not block the UI:
+          - stuck: connection is being established but not connected.
+            Paused sessions are left alone.
+          - orphaned: the config has been deleted and it is not connected.
+            At startup only sessions which have tried to connect count.
+            Connected ones are kept, "openvpn3 session-start --config" uses
+            single-use configs which are gone as soon as the session starts.
+        When run periodically, a session has to be seen stuck or orphaned
+        twice in a row, so a session which is just reconnecting is left alone.
+        Each session gets SESSION_GC_TIMEOUT seconds from the moment a worker
+        picks it up. Sessions returned by the protected() callable are never
+        touched. The report is passed to on_done() in the main loop.
+    """
+    def __init__(self, protected, on_done):
+        self.__protected = protected
+        self.__on_done = on_done
+        self.__suspects = set()
+        self.__started = {}                     # session path -> time a worker picked it up
+        self.running = False
+
+    def start(self, grace: bool = True) -> bool:
+        """ Start a cleanup unless one is already running. """
+        if not self.running:
+            self.running = True
+            threading.Thread(target=self.__run, args=(grace,), daemon=True).start()
+        return True
+
+    def __run(self, grace: bool):
+        report = []
+        pool = None
+        try:
+            with METRICS.dbus_call("FetchAvailableConfigs"):
+                config_paths = {c.GetPath() for c in
+                                openvpn3.ConfigurationManager(sysbus).FetchAvailableConfigs()}
+            with METRICS.dbus_call("FetchAvailableSessions"):
+                sessions = openvpn3.SessionManager(sysbus).FetchAvailableSessions()
+
+            self.__started = {}
+            pool = concurrent.futures.ThreadPoolExecutor(max_workers=SESSION_GC_WORKERS)
+            futures = {pool.submit(self.__check, s, config_paths, grace): s.GetPath()
+                       for s in sessions}
+            pending = set(futures)
+            suspects = set()
+            while pending:
+                done, pending = concurrent.futures.wait(
+                    pending, timeout=0.5, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    path = futures[future]
+                    try:
+                        result = future.result()
+                    except dbus.exceptions.DBusException as e:
+                        # The session may have gone away in the meantime
+                        print("Failed to clean up session", path, e.get_dbus_message())
+                        continue
+                    if result is None:
+                        continue
+                    if result["reason"] == "suspect":
+                        suspects.add(path)
+                    else:
+                        report.append(result)
+                # Give up on sessions which take too long, queued ones are not affected
+                now = time.monotonic()
+                for future in [f for f in pending
+                               if now - self.__started.get(futures[f], now) > SESSION_GC_TIMEOUT]:
+                    pending.discard(future)
+                    report.append({"session_path": futures[future], "reason": "timeout"})
+            self.__suspects = suspects
+        except dbus.exceptions.DBusException as e:
+            print("Session cleanup failed:", e.get_dbus_message())
+        finally:
+            if pool:
+                # Don't wait for calls which have timed out
+                pool.shutdown(wait=False)
+            GLib.idle_add(self.__done, report)
+
+    def __check(self, session: openvpn3.Session, config_paths: set, grace: bool) -> Optional[dict]:
+        """ Runs in a worker thread. Disconnects the session if needed
+            and returns what has been done.
+        """
+        path = session.GetPath()
+        self.__started[path] = time.monotonic()
+        if path in self.__protected():
+            return None
+        with METRICS.dbus_call("GetStatus"):
+            status = session.GetStatus()
+        connection = status["major"] == StatusMajor.CONNECTION
+        # Connected sessions and the ones paused by the user are fine
+        if connection and status["minor"] in (StatusMinor.CONN_CONNECTED,
+                                              StatusMinor.CONN_PAUSING,
+                                              StatusMinor.CONN_PAUSED,
+                                              StatusMinor.CONN_RESUMING):
+            return None
+        if session.GetProperty("config_path") not in config_paths:
+            # At startup only sessions which have tried to connect, like before.
+            # A CLI session may still be waiting for credentials.
+            if not connection and not grace:
+                return None
+            reason = "orphaned"
+        elif connection:
+            reason = "stuck"
+        else:
+            return None
+        if grace and path not in self.__suspects:
+            return {"session_path": path, "reason": "suspect"}
+        result = {"session_path": path,
+                  "config_name":  session.GetProperty("config_name"),
+                  "status":       status["message"],
+                  "reason":       reason}
+        # The user may have started connecting in the meantime
+        if path in self.__protected():
+            return None
+        with METRICS.dbus_call("Disconnect"):
+            session.Disconnect()
+        return result
+
+    def __done(self, report: list) -> bool:
+        self.running = False
+        for r in report:
+            if r["reason"] != "timeout":
+                METRICS.inc("ovpn3gui_sessions_cleaned_total", {"reason": r["reason"]})
+        self.__on_done(report)
+        return False
+
+# rtnetlink constants, see linux/netlink.h, linux/rtnetlink.h and linux/if.h
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_ROUTE = 0x400
+NLMSG_HDR = struct.Struct("=IHHII")             # len, type, flags, seq, pid
+IFINFOMSG = struct.Struct("=BxHiII")            # family, type, index, flags, change
+# family, dst_len, src_len, tos, table, protocol, scope, type, flags
+RTMSG = struct.Struct("=BBBBBBBBI")
+RTATTR = struct.Struct("=HH")                   # len, type
+RTM_NEWLINK, RTM_DELLINK, RTM_NEWROUTE, RTM_DELROUTE = 16, 17, 24, 25
+IFLA_IFNAME = 3
+RTA_OIF = 4
+RTA_TABLE = 15
+RT_TABLE_MAIN = 254
+RTN_UNICAST = 1
+ARPHRD_NONE = 0xFFFE                            # tun devices
+IFF_UP = 0x1
+IFF_RUNNING = 0x40
+IFF_LOWER_UP = 0x10000
+
+def _rtattrs(data: bytes, offset: int) -> dict:
+    """ Parse netlink attributes into {type: payload}. """
+    attrs = {}
+    while offset + RTATTR.size <= len(data):
+        length, rta_type = RTATTR.unpack_from(data, offset)
+        if length < RTATTR.size:
+            break
+        attrs[rta_type] = data[offset + RTATTR.size:offset + length]
+        offset += (length + 3) & ~3
+    return attrs
+
+def parse_rtnetlink(data: bytes) -> Iterator[dict]:
+    """ Turn a datagram received from a NETLINK_ROUTE socket into link and route events. """
+    offset = 0
+    while offset + NLMSG_HDR.size <= len(data):
+        length, msg_type, _, _, _ = NLMSG_HDR.unpack_from(data, offset)
+        if length < NLMSG_HDR.size:
+            break
+        msg = data[offset:offset + length]
+        body = NLMSG_HDR.size
+        if msg_type in (RTM_NEWLINK, RTM_DELLINK) and len(msg) >= body + IFINFOMSG.size:
+            _, arphrd, index, flags, change = IFINFOMSG.unpack_from(msg, body)
+            attrs = _rtattrs(msg, body + IFINFOMSG.size)
+            yield { "kind":    "link",
+                    "new":     msg_type == RTM_NEWLINK,
+                    "index":   index,
+                    "name":    attrs.get(IFLA_IFNAME, b"").rstrip(b"\0").decode(errors="replace"),
+                    "arphrd":  arphrd,
+                    "flags":   flags,
+                    "change":  change }
+        elif msg_type in (RTM_NEWROUTE, RTM_DELROUTE) and len(msg) >= body + RTMSG.size:
+            family, dst_len, _, _, table, _, _, rtm_type, _ = RTMSG.unpack_from(msg, body)
+            attrs = _rtattrs(msg, body + RTMSG.size)
+            if RTA_TABLE in attrs:
+                table = struct.unpack("=I", attrs[RTA_TABLE][:4])[0]
+            oif = struct.unpack("=i", attrs[RTA_OIF][:4])[0] if RTA_OIF in attrs else None
+            yield { "kind":    "route",
+                    "new":     msg_type == RTM_NEWROUTE,
+                    "family":  family,
+                    "dst_len": dst_len,
+                    "table":   table,
+                    "type":    rtm_type,
+                    "oif":     oif }
+        offset += (length + 3) & ~3
+
+class NetworkMonitor:
+    """ Listens to rtnetlink notifications in the GLib main loop and calls
+        callback() when the network has come back in a different shape:
+        a new default route or a link which went up. Deletions are ignored,
+        there is nothing to recover until a replacement shows up. Tunnel
+        devices are ignored, so the VPN does not trigger itself. Bursts of
+        events are coalesced into a single call.
+    """
+    def __init__(self, callback, delay_ms: int = NETWORK_CHANGE_DELAY_MS):
+        self.__callback = callback
+        self.__delay_ms = delay_ms
+        self.__sock = None
+        self.__watch_id = None
+        self.__timeout_id = None
+        self.__tunnel_links = set()
+        self.__link_flags = {}
+
+    def start(self):
+        self.__sock = socket.socket(socket.AF_NETLINK,
+                                    socket.SOCK_RAW | socket.SOCK_NONBLOCK,
+                                    socket.NETLINK_ROUTE)
+        self.__sock.bind((0, RTMGRP_LINK | RTMGRP_IPV4_ROUTE | RTMGRP_IPV6_ROUTE))
+        self.__watch_id = GLib.io_add_watch(self.__sock.fileno(), GLib.PRIORITY_DEFAULT,
+                                            GLib.IO_IN, self.__on_readable)
+
+    def stop(self):
+        for source_id in (self.__watch_id, self.__timeout_id):
+            if source_id is not None:
+                GLib.source_remove(source_id)
+        self.__watch_id = self.__timeout_id = None
+        if self.__sock:
+            self.__sock.close()
+            self.__sock = None
+
+    def __on_readable(self, _fd, _condition) -> bool:
+        while True:
+            try:
+                data = self.__sock.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno != errno.ENOBUFS:
+                    raise
+                # The kernel dropped notifications, assume something has changed
+                self.__schedule()
+                continue
+            if any(self.__is_relevant(e) for e in parse_rtnetlink(data)):
+                self.__schedule()
+        return True
+
+    def __is_relevant(self, event: dict) -> bool:
+        if event["kind"] == "link":
+            if event["arphrd"] == ARPHRD_NONE or event["name"].startswith("tun"):
+                if event["new"]:
+                    self.__tunnel_links.add(event["index"])
+                else:
+                    self.__tunnel_links.discard(event["index"])
+                return False
+            if not event["new"]:
+                self.__link_flags.pop(event["index"], None)
+                return False
+            # Carrier changes are reported with ifi_change == 0, so compare
+            # with the flags we have seen before
+            prev = self.__link_flags.get(event["index"])
+            self.__link_flags[event["index"]] = event["flags"]
+            if not event["flags"] & IFF_RUNNING:
+                return False
+            if prev is None:
+                return bool(event["change"] & (IFF_UP | IFF_RUNNING | IFF_LOWER_UP))
+            return not prev & IFF_RUNNING
+        return bool(event["new"] and event["dst_len"] == 0 and
+                    event["table"] == RT_TABLE_MAIN and event["type"] == RTN_UNICAST and
+                    event["oif"] not in self.__tunnel_links)
+
+    def __schedule(self):
+        if self.__timeout_id is not None:
+            GLib.source_remove(self.__timeout_id)
+        self.__timeout_id = GLib.timeout_add(self.__delay_ms, self.__on_settled)
+
+    def __on_settled(self) -> bool:
+        self.__timeout_id = None
+        self.__callback()
+        return False
+
 class UserCreds(Gtk.Dialog):
     """ Represents user credentials (username, password, OTP).
         Can interact with the user and prompt credentials with a modal dialog.
@@ -180,6 +1007,55 @@ class EventBoxWithData(Gtk.EventBox):           # pylint: disable=too-few-public
         super().__init__()
         self.config = data
 
+class BackendWarmup:
+    """ Speculatively brings a freshly created session to the point where
+        the backend asks for user credentials. Runs from GLib timers, so it
+        keeps polling while a modal dialog (e.g. UserCreds) is running.
+    """
+    SETTLE_MS = 1000        # Give the backend some time to settle after NewTunnel()
+    POLL_MS = 250
+
+    def __init__(self, session: openvpn3.Session):
+        self.session = session
+        self.needs_creds = False
+        self.error_msg = None
+        self.__deadline = time.monotonic() + self.SETTLE_MS / 1000
+        self.__source_id = GLib.timeout_add(self.SETTLE_MS, self.__start_polling)
+
+    def __start_polling(self) -> bool:
+        self.__source_id = None
+        if self.__poll():
+            self.__source_id = GLib.timeout_add(self.POLL_MS, self.__poll)
+        return False
+
+    def __poll(self) -> bool:
+        """ Returns True while the backend is still starting up. """
+        try:
+            with METRICS.dbus_call("Ready"):
+                self.session.Ready()
+            # Nothing to ask for, the session can be connected right away
+            self.__source_id = None
+            return False
+        except dbus.exceptions.DBusException as e:
+            if str(e).find('Backend VPN process is not ready') > 0:
+                return True
+            if str(e).find(' Missing user credentials') > 0:
+                self.needs_creds = True
+            else:
+                self.error_msg = e.get_dbus_message()
+        self.__source_id = None
+        return False
+
+    def stop(self):
+        """ Stop polling. Called as soon as the user has closed the dialog. """
+        if self.__source_id is not None:
+            GLib.source_remove(self.__source_id)
+            self.__source_id = None
+
+    def settle_time_left(self) -> float:
+        """ Seconds left until the backend is considered settled. """
+        return max(0.0, self.__deadline - time.monotonic())
+
 MENU_XML = """
 <?xml version="1.0" encoding="UTF-8"?>
 <interface>
@@ -193,6 +1069,14 @@ MENU_XML = """
         <attribute name="action">app.view_log</attribute>
         <attribute name="label" translatable="yes">View _Log</attribute>
       </item>
+      <item>
+        <attribute name="action">app.view_timings</attribute>
+        <attribute name="label" translatable="yes">Connection _Timings</attribute>
+      </item>
+      <item>
+        <attribute name="action">app.export_timings</attribute>
+        <attribute name="label" translatable="yes">Export Timings...</attribute>
+      </item>
     </section>
     <section>
       <attribute name="label" translatable="yes">Appearance</attribute>
@@ -237,22 +1121,118 @@ class AppWindow(Gtk.ApplicationWindow):
 
         self.configs = []
         self.f_log = None
+        # Set up by the reconcile worker, so that the first paint does not wait for D-Bus
+        self.cmgr = None
+        self.smgr = None
 
         data_dir = os.path.join(GLib.get_user_data_dir(), 'ovpn3gui')
         if not os.path.exists(data_dir):
             os.makedirs(data_dir, mode=0o700)
         self.__saved_usernames = PersistentDict(os.path.join(data_dir, "usernames.json"))
+        self.profile_dir_sync = None
+        if os.environ.get(PROFILE_DIR_ENV):
+            self.profile_dir_sync = ProfileDirSync(
+                os.environ[PROFILE_DIR_ENV],
+                PersistentDict(os.path.join(data_dir, "synced_profiles.json")))
+
+        # Last known connection list, used to paint the window
+        # before the backend has been queried
+        self.__snapshot = PersistentDict(os.path.join(data_dir, "snapshot.json"))
+
+        # Session being set up by the user, the session cleanup must not touch it
+        self.connecting_session_path = None
+        self.busy = False
+        self.session_collector = SessionCollector(
+            lambda: {self.connecting_session_path} - {None}, self.on_sessions_collected)
+        self.network_monitor = NetworkMonitor(self.on_network_changed)
+        self.last_network_restart = 0
+        self.selftest_results = {}              # session path -> formatted result
+        self.profile_sync_pending = False
+        self.profile_sync_running = False
+        self.network_change_pending = False
+        self.reconcile_failed = False
+        self.startup_cleanup_done = False
 
         self.set_border_width(10)
         self.set_default_size(300, 400)
         self.set_resizable(False)
-        self.connect_dbus()
-        self.kill_lingering_sessions()
-        self.load_connections()
-        self.draw_win()
+        self.configs = self.__snapshot["configs"] or []
+        start = time.monotonic()
+        self.draw_win(self.__snapshot["status"] or "Disconnected")
+        METRICS.observe("ovpn3gui_redraw_duration_seconds", time.monotonic() - start)
+        # The snapshot may be outdated, don't let the user act on it
+        self.listbox.set_sensitive(False)
         self.idle_counter = 0
         # Setup timer to increment idle counter every minute
         self.timeout_id = GLib.timeout_add_seconds(60, self.auto_exit, None)
+        # Idle callbacks run after the window has been painted
+        GLib.idle_add(self.reconcile)
+
+    def reconcile(self) -> bool:
+        """ Bring the window painted from the snapshot in line with the backend.
+            The backend is queried in a worker thread, so the window stays
+            responsive. Only the rows that differ are replaced.
+        """
+        # Sessions left behind by a previous run are cleaned up immediately.
+        # The connection list is fetched once this is done, see
+        # on_sessions_collected(), so that killed sessions are not shown.
+        self.session_collector.start(grace=False)
+        GLib.timeout_add_seconds(SESSION_GC_INTERVAL, self.session_collector.start)
+        try:
+            self.network_monitor.start()
+        except OSError as e:
+            print("Network change monitoring is not available:", e)
+        if METRICS.enabled:
+            GLib.timeout_add_seconds(METRICS_REFRESH_SECONDS, self.refresh_metrics)
+        return False
+
+    def __start_reconcile_worker(self) -> bool:
+        threading.Thread(target=self.__reconcile_worker, daemon=True).start()
+        return False
+
+    def __reconcile_worker(self):
+        cmgr, smgr, configs, status, error = None, None, None, None, None
+        try:
+            cmgr = openvpn3.ConfigurationManager(sysbus)
+            smgr = openvpn3.SessionManager(sysbus)
+            if self.profile_dir_sync:
+                self.profile_dir_sync.sync(cmgr)
+            configs = self.fetch_connections(cmgr, smgr)
+            status = self.fetch_connection_status(smgr, configs)
+        except dbus.exceptions.DBusException as e:
+            error = e.get_dbus_message()
+        except Exception as e:                  # pylint: disable=broad-except
+            error = str(e)
+        GLib.idle_add(self.__apply_reconcile, cmgr, smgr, configs, status, error)
+
+    def __apply_reconcile(self, cmgr: openvpn3.ConfigurationManager, smgr: openvpn3.SessionManager,
+                          configs: list, status: str, error: str) -> bool:
+        if error:
+            # The snapshot rows may refer to configs and sessions which do not
+            # exist anymore, so keep them greyed out and try again later
+            if not self.reconcile_failed:
+                self.display_error("Failed to load VPN connections",
+                                   "Please check that the OpenVPN3 service is running.\n" + error)
+            self.reconcile_failed = True
+            self.label_status.set_text("OpenVPN3 service is not available")
+            GLib.timeout_add_seconds(RECONCILE_RETRY_INTERVAL, self.__start_reconcile_worker)
+            return False
+        self.reconcile_failed = False
+        self.cmgr, self.smgr = cmgr, smgr
+        self.listbox.set_sensitive(True)
+        self.configs = configs
+        self.update_rows()
+        self.label_status.set_text(status)
+        self.__save_snapshot(status)
+        # Watch only now, so that this sync does not race with the initial one
+        if self.profile_dir_sync:
+            self.profile_dir_sync.watch(self.on_profile_dir_changed)
+        if METRICS.enabled:
+            self.refresh_metrics()
+        return False
+
+    def __save_snapshot(self, status: str):
+        self.__snapshot.replace({"configs": self.configs, "status": status})
 
     def __create_header_bar(self) -> Gtk.HeaderBar:
         """ Create window header bar with menu icon in it. """
@@ -290,44 +1270,150 @@ class AppWindow(Gtk.ApplicationWindow):
         self.smgr = openvpn3.SessionManager(sysbus)
 
     def load_connections(self):
+        self.configs = self.fetch_connections(self.cmgr, self.smgr)
+
+    @staticmethod
+    def fetch_connections(cmgr: openvpn3.ConfigurationManager,
+                          smgr: openvpn3.SessionManager) -> list:
         """ Fetch Session and Config objects from OpenVPN3
             and combine them to form a connection list.
+            Does not touch the UI, so it can be used from a worker thread.
         """
-        self.configs = [
+        with METRICS.dbus_call("FetchAvailableConfigs"):
+            available_configs = cmgr.FetchAvailableConfigs()
+        configs = [
             { "config_name":  c.GetConfigName(),
               "config_path":  c.GetPath(),
-              "session_path": None
-            } for c in self.cmgr.FetchAvailableConfigs()]
+              "session_path": None,
+              "connected":    False
+            } for c in available_configs]
 
         # Relate Configs to Sessions. Note that there is no 1:1 relation.
         # A config can have multiple sessions and a session can exist
         # without a config if config was deleted. We handle such cases
         # by adding these stale sessions to the connection list.
-        for s in self.smgr.FetchAvailableSessions():
+        with METRICS.dbus_call("FetchAvailableSessions"):
+            sessions = smgr.FetchAvailableSessions()
+        for s in sessions:
             conf_name = s.GetProperty("config_name")
             conf_path = s.GetProperty("config_path")
             sess_path = s.GetPath()
+            with METRICS.dbus_call("GetStatus"):
+                status = s.GetStatus()
+            connected = (status["major"] == StatusMajor.CONNECTION and
+                         status["minor"] == StatusMinor.CONN_CONNECTED)
             attached = False
-            for c in self.configs:
+            for c in configs:
                 if c["config_path"] == conf_path:
                     c["session_path"] = sess_path
+                    c["connected"] = connected
                     attached = True
                     break
             if not attached:
                 print("Attaching stale session", conf_name)
-                self.configs.append({
+                configs.append({
                     "config_name": conf_name,
                     "config_path": conf_path,
-                    "session_path": sess_path
+                    "session_path": sess_path,
+                    "connected": connected
                 })
+        return configs
 
-    def kill_lingering_sessions(self):
-        for s in self.smgr.FetchAvailableSessions():
-            status = s.GetStatus()
-            if (status["major"] == StatusMajor.CONNECTION and
-                status["minor"] != StatusMinor.CONN_CONNECTED):
-                print("Killing lingering session with status", status)
-                s.Disconnect()
+    def on_profile_dir_changed(self):
+        """ Sync the profile directory in a worker thread. Deferred while the
+            user is connecting, the config being connected must not change.
+        """
+        if self.profile_sync_pending:
+            return
+        self.profile_sync_pending = True
+        if self.__try_profile_sync():
+            GLib.timeout_add(PROFILE_DIR_SYNC_DELAY_MS, self.__try_profile_sync)
+
+    def __try_profile_sync(self) -> bool:
+        """ Returns True if the sync has to be retried later. """
+        if self.busy or self.profile_sync_running:
+            return True
+        self.profile_sync_pending = False
+        self.profile_sync_running = True
+
+        def worker():
+            changed = False
+            try:
+                changed = self.profile_dir_sync.sync(openvpn3.ConfigurationManager(sysbus))
+            except dbus.exceptions.DBusException as e:
+                print("Profile directory sync failed:", e.get_dbus_message())
+            finally:
+                GLib.idle_add(self.__profile_sync_done, changed)
+
+        threading.Thread(target=worker, daemon=True).start()
+        return False
+
+    def __profile_sync_done(self, changed: bool) -> bool:
+        self.profile_sync_running = False
+        # If the user is in the middle of connecting, the window is redrawn after that anyway
+        if changed and not self.busy:
+            self.redraw_win()
+        return False
+
+    def on_network_changed(self):
+        """ Restart the active session after a network change (e.g. switching
+            Wi-Fi networks, resume from suspend) instead of waiting for
+            the keepalive timeout to notice the tunnel is dead.
+            Deferred while the user is connecting or disconnecting.
+        """
+        if self.network_change_pending:
+            return
+        self.network_change_pending = True
+        if self.__try_network_restart():
+            GLib.timeout_add(NETWORK_CHANGE_DELAY_MS, self.__try_network_restart)
+
+    def __try_network_restart(self) -> bool:
+        """ Returns True if the restart has to be retried later. """
+        if self.busy:
+            return True
+        self.network_change_pending = False
+        # Changes caused by the last restart itself
+        if time.monotonic() - self.last_network_restart < NETWORK_RESTART_COOLDOWN:
+            return False
+        self.connect_dbus()
+        for c in self.configs:
+            if c["session_path"] is None:
+                continue
+            try:
+                session = self.smgr.Retrieve(c["session_path"])
+                with METRICS.dbus_call("GetStatus"):
+                    status = session.GetStatus()
+                # Leave alone failed sessions and the ones paused by the user
+                if (status["major"] != StatusMajor.CONNECTION or
+                    status["minor"] not in (StatusMinor.CONN_CONNECTED,
+                                            StatusMinor.CONN_RECONNECTING)):
+                    continue
+                print("Network has changed, restarting session", c["config_name"])
+                with METRICS.dbus_call("Restart"):
+                    session.Restart()
+                METRICS.inc("ovpn3gui_network_restarts_total")
+                self.last_network_restart = time.monotonic()
+            except dbus.exceptions.DBusException as e:
+                print("Failed to restart session", c["session_path"], e.get_dbus_message())
+        return False
+
+    def on_sessions_collected(self, report: list):
+        """ Called when the session cleanup has finished. """
+        for r in report:
+            if r["reason"] == "timeout":
+                print("Timed out cleaning up session", r["session_path"])
+            else:
+                print(f"Killed {r['reason']} session {r['config_name']} "
+                      f"({r['session_path']}) with status: {r['status']}")
+        if not self.startup_cleanup_done:
+            # The first cleanup has finished, now load the connection list
+            self.startup_cleanup_done = True
+            self.__start_reconcile_worker()
+            return
+        # Remove rows of the killed sessions, unless the user is in the middle
+        # of something. The window is redrawn after that anyway.
+        if report and not self.busy and self.listbox.get_sensitive():
+            self.redraw_win()
 
     def __ok_to_disconnect(self) -> bool:
         """ Confirm with the user if he is fine to disconnect
@@ -350,73 +1436,121 @@ class AppWindow(Gtk.ApplicationWindow):
         return True
 
     def redraw_win(self):
+        start = time.monotonic()
         self.load_connections()
         for k in self.box_outer.get_children():
             k.destroy()
         self.remove(self.box_outer)
         self.draw_win()
         self.show_all()
+        # Self-test results below the status line are not worth keeping
+        self.__save_snapshot(self.label_status.get_text().split("\n")[0])
+        METRICS.observe("ovpn3gui_redraw_duration_seconds", time.monotonic() - start)
 
-    def draw_win(self):
+    def draw_win(self, status: Optional[str] = None):
         self.box_outer = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
         self.add(self.box_outer)
 
-        listbox = Gtk.ListBox()
-        listbox.set_selection_mode(Gtk.SelectionMode.NONE)
-        # listbox.connect('row-activated', self.on_row_activated)
-        self.box_outer.pack_start(listbox, True, True, 0)
+        self.listbox = Gtk.ListBox()
+        self.listbox.set_selection_mode(Gtk.SelectionMode.NONE)
+        # self.listbox.connect('row-activated', self.on_row_activated)
+        self.box_outer.pack_start(self.listbox, True, True, 0)
 
-        # Populate listbox with VPN connections (rows). Each row consists of 3 columns:
-        #   on/off switch | profile name | delete button
         for c in self.configs:
-            row = ListBoxRowWithData(c)
-            hbox = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=50)
-            row.add(hbox)
-
-            # Left column: On/Off switch
-            switch = SwitchWithData(c)
-            switch.set_active(c["session_path"] is not None)
-            switch.set_tooltip_text("Connect/Disconnect")
-            switch.connect("notify::active", self.on_switch_activated)
-            switch.props.valign = Gtk.Align.CENTER
-            hbox.pack_start(switch, False, True, 0)
-
-            # Middle column: VPN Profile Name
-            # We need EventBox here because Gtk.Box cannot handle double-click
-            evbox = EventBoxWithData(c)
-            evbox.connect("button-press-event", self.vpn_profile_button_press)
-            vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-            evbox.add(vbox)
-            hbox.pack_start(evbox, True, True, 0)
-
-            # Top/bottom labels in the middle column
-            top_label = Gtk.Label(label="OpenVPN Profile", xalign=0)
-            top_label.set_sensitive(False)
-            bottom_label = Gtk.Label(label=c["config_name"], xalign=0)
-            vbox.pack_start(top_label, True, True, 0)
-            vbox.pack_start(bottom_label, True, True, 0)
-
-            # Right column: Delete profile button
-            button = Gtk.Button.new_from_icon_name("list-remove-symbolic", Gtk.IconSize.BUTTON)
-            button.set_tooltip_text("Delete Profile")
-            button.connect("clicked", self.on_delete_profile_clicked, c)
-            hbox.pack_start(button, False, False, 0)
-
-            listbox.add(row)
+            self.listbox.add(self.__create_row(c))
 
         # Status line and "Add profile" button at the bottom of the window
-        label_status = Gtk.Label(label=self.get_connection_status(), xalign=0)
+        if status is None:
+            status = self.get_connection_status()
+        for c in self.configs:
+            if c["session_path"] in self.selftest_results:
+                status += "\n" + self.selftest_results[c["session_path"]]
+        self.label_status = Gtk.Label(label=status, xalign=0)
         add_button = Gtk.Button.new_from_icon_name("list-add-symbolic", Gtk.IconSize.BUTTON)
         add_button.set_tooltip_text("Import Profile")
         add_button.connect("clicked", self.on_add_profile_clicked)
 
         # Pack the status label and "Add profile" button into the horizontal box
         bottom_hbox = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=50)
-        bottom_hbox.pack_start(label_status, False, False, 0)
+        bottom_hbox.pack_start(self.label_status, False, False, 0)
         bottom_hbox.pack_end(add_button, False, False, 0)
 
         self.box_outer.pack_end(bottom_hbox, False, False, 0)
 
+    def __create_row(self, c) -> ListBoxRowWithData:
+        """ Create a listbox row for a VPN connection. Each row consists of 3 columns:
+              on/off switch | profile name | delete button
+        """
+        row = ListBoxRowWithData(c)
+        hbox = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=50)
+        row.add(hbox)
+
+        # Left column: On/Off switch
+        switch = SwitchWithData(c)
+        switch.set_active(c["session_path"] is not None)
+        switch.set_tooltip_text("Connect/Disconnect")
+        switch.connect("notify::active", self.on_switch_activated)
+        switch.props.valign = Gtk.Align.CENTER
+        hbox.pack_start(switch, False, True, 0)
+
+        # Middle column: VPN Profile Name
+        # We need EventBox here because Gtk.Box cannot handle double-click
+        evbox = EventBoxWithData(c)
+        evbox.connect("button-press-event", self.vpn_profile_button_press)
+        vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        evbox.add(vbox)
+        hbox.pack_start(evbox, True, True, 0)
+
+        # Top/bottom labels in the middle column
+        top_label = Gtk.Label(label="OpenVPN Profile", xalign=0)
+        top_label.set_sensitive(False)
+        bottom_label = Gtk.Label(label=c["config_name"], xalign=0)
+        vbox.pack_start(top_label, True, True, 0)
+        vbox.pack_start(bottom_label, True, True, 0)
+
+        # Self-test button for connected sessions
+        if c.get("connected"):
+            button = Gtk.Button.new_from_icon_name("network-transmit-receive-symbolic",
+                                                   Gtk.IconSize.BUTTON)
+            button.set_tooltip_text("Tunnel Self-test")
+            button.connect("clicked", self.on_selftest_clicked, c)
+            hbox.pack_start(button, False, False, 0)
+
+        # Right column: Delete profile button
+        button = Gtk.Button.new_from_icon_name("list-remove-symbolic", Gtk.IconSize.BUTTON)
+        button.set_tooltip_text("Delete Profile")
+        button.connect("clicked", self.on_delete_profile_clicked, c)
+        hbox.pack_start(button, False, False, 0)
+
+        return row
+
+    def update_rows(self):
+        """ Update the listbox to match self.configs, keeping the rows
+            that have not changed untouched.
+        """
+        def key(c) -> tuple:
+            return c["config_path"], c["session_path"]
+
+        wanted = {key(c): c for c in self.configs}
+        rows = {}
+        for row in self.listbox.get_children():
+            if wanted.get(key(row.config)) == row.config and key(row.config) not in rows:
+                rows[key(row.config)] = row
+            else:
+                row.destroy()
+
+        for i, c in enumerate(self.configs):
+            row = rows.get(key(c))
+            if row is not None and row.get_index() == i:
+                continue
+            if row is not None:
+                # Moved, re-insert at the right position
+                self.listbox.remove(row)
+            else:
+                row = self.__create_row(c)
+            self.listbox.insert(row, i)
+            row.show_all()
+
     def show_config(self, config):
         config_text = self.cmgr.Retrieve(config["config_path"]).Fetch()
         win = TextFileWindow(title=config["config_name"], text=config_text)
@@ -432,19 +1566,62 @@ class AppWindow(Gtk.ApplicationWindow):
         print(row.config, "activated")
 
     def get_connection_status(self) -> str:
-        status = "Disconnected"
-        for c in self.configs:
+        return self.fetch_connection_status(self.smgr, self.configs)
+
+    def fetch_connection_status(self, smgr: openvpn3.SessionManager, configs: list) -> str:
+        """ Status line text, taken from the first session. When metrics are
+            enabled, the state of every session is recorded as well.
+            Does not touch the UI, so it can be used from a worker thread.
+        """
+        status = None
+        METRICS.clear("ovpn3gui_session_")
+        for c in configs:
             path = c["session_path"]
             if path is not None:
-                session = self.smgr.Retrieve(path)
-                s = session.GetStatus()
-                if (s["major"] == StatusMajor.CONNECTION and
-                    s["minor"] == StatusMinor.CONN_CONNECTED):
-                    status = "Connected to " + session.GetProperty("session_name")
-                else:
-                    status = s["message"]
-                break
-        return status
+                session = smgr.Retrieve(path)
+                with METRICS.dbus_call("GetStatus"):
+                    s = session.GetStatus()
+                connected = (s["major"] == StatusMajor.CONNECTION and
+                             s["minor"] == StatusMinor.CONN_CONNECTED)
+                if status is None:
+                    if connected:
+                        status = "Connected to " + session.GetProperty("session_name")
+                    else:
+                        status = s["message"]
+                if not METRICS.enabled:
+                    break
+                self.__record_session_metrics(session, c, s, connected)
+        return status if status is not None else "Disconnected"
+
+    def __record_session_metrics(self, session: openvpn3.Session, config, status, connected: bool):
+        labels = {"config_name": config["config_name"], "session_path": config["session_path"]}
+        METRICS.set("ovpn3gui_session_connected", int(connected), labels)
+        METRICS.set("ovpn3gui_session_status", 1,
+                    dict(labels, major=str(status["major"]), minor=str(status["minor"])))
+        if connected:
+            with METRICS.dbus_call("GetConnectionStats"):
+                stats = session.GetConnectionStats()
+            METRICS.set("ovpn3gui_session_bytes_in", stats.get("BYTES_IN", 0), labels)
+            METRICS.set("ovpn3gui_session_bytes_out", stats.get("BYTES_OUT", 0), labels)
+
+    def refresh_metrics(self) -> bool:
+        """ Periodically refresh session metrics and the textfile collector file.
+            This is independent of how often the metrics are scraped.
+        """
+        try:
+            # Not connected to the backend yet
+            if self.smgr is not None:
+                self.get_connection_status()
+        except dbus.exceptions.DBusException as e:
+            print("Failed to refresh metrics:", e.get_dbus_message())
+        filename = os.environ.get(METRICS_FILE_ENV)
+        if filename:
+            # Don't let the error escape, GLib would remove the timer
+            try:
+                METRICS.write_textfile(filename)
+            except OSError as e:
+                print("Failed to write metrics file:", e)
+        return True
 
     def on_switch_activated(self, switch: SwitchWithData, _gparam):
         GLib.timeout_add(0, self.__do_switch_activated, switch)
@@ -452,11 +1629,16 @@ class AppWindow(Gtk.ApplicationWindow):
     def __do_switch_activated(self, switch: SwitchWithData):
         self.idle_counter = 0
         self.connect_dbus()
-        if switch.get_active():
-            if not self.__connect_vpn(switch.config):
-                switch.set_state(False)
-        else:
-            self.__disconnect_vpn(switch.config)
+        self.busy = True
+        try:
+            if switch.get_active():
+                if not self.__connect_vpn(switch.config):
+                    switch.set_state(False)
+            else:
+                self.__disconnect_vpn(switch.config)
+        finally:
+            self.busy = False
+            self.connecting_session_path = None
         self.redraw_win()
 
     def flush_gtk_events(self):
@@ -479,38 +1661,78 @@ class AppWindow(Gtk.ApplicationWindow):
         if not self.__ok_to_disconnect():
             return False
 
+        # Create the tunnel and let the backend reach the "credentials needed"
+        # state while the user is still typing, so it is off the critical path
+        session = self.__new_session(config["config_path"])
+        self.connecting_session_path = session.GetPath()
+        print("Session D-Bus path: " + session.GetPath())
+        self.__start_session_log(session)
+        warmup = BackendWarmup(session)
+
         creds = UserCreds(self, config["config_name"], self.__saved_usernames)
         ok = creds.ask_user_creds()
-        if ok:
-            spinner = SpinnerWindow(self, "Connecting to " + config["config_name"] + "...")
-            ok, err_msg = self.__do_connect_vpn(config, spinner, creds)
-            spinner.destroy()
-            if spinner.cancelled_by_user:
-                return False
-            if not ok:
-                self.display_error("Error connecting to " + config["config_name"], err_msg)
-        return ok
+        warmup.stop()
+        if not ok:
+            self.__discard_session(session)
+            return False
+        if warmup.error_msg:
+            # The backend has already failed, no point in sending the credentials
+            self.__discard_session(session)
+            self.display_error("Error connecting to " + config["config_name"], warmup.error_msg)
+            return False
 
-    def __do_connect_vpn(self, config, spinner: SpinnerWindow,
-                         creds: UserCreds) -> Tuple[bool, str]:
-        session = self.__new_session(config["config_path"])
-        print("Session D-Bus path: " + session.GetPath())
+        self.__log_connect_attempt(session, config["config_name"])
+        spinner = SpinnerWindow(self, "Connecting to " + config["config_name"] + "...")
+        start = time.monotonic()
+        ok, err_msg = self.__do_connect_vpn(session, warmup, spinner, creds)
+        spinner.destroy()
+        result = "cancelled" if spinner.cancelled_by_user else "connected" if ok else "failed"
+        METRICS.inc("ovpn3gui_connect_attempts_total", {"result": result})
+        METRICS.observe("ovpn3gui_connect_duration_seconds", time.monotonic() - start)
+        if spinner.cancelled_by_user:
+            return False
+        if not ok:
+            self.display_error("Error connecting to " + config["config_name"], err_msg)
+        return ok
 
-        # Start background logging process for this session
+    def __start_session_log(self, session: openvpn3.Session):
+        """ Start background logging process for the session. """
         with open(self.application.log_filename, "a", encoding="utf-8") as self.f_log:
             subprocess.Popen(["/usr/bin/openvpn3", "log",
                               "--log-level", "6",
                               "--session-path", session.GetPath()],
                              stdout=self.f_log, stderr=self.f_log)
 
+    def __log_connect_attempt(self, session: openvpn3.Session, config_name: str):
+        """ Marker line so that the log parser knows where a connection attempt
+            begins. Written once the user has submitted the credentials, so the
+            time spent typing them is not counted.
+        """
+        with open(self.application.log_filename, "a", encoding="utf-8") as f:
+            f.write(f"{time.ctime()} [{LOG_MARKER_CATEGORY}] Starting session "
+                    f"{session.GetPath()} for {config_name}\n")
+
+    def __do_connect_vpn(self, session: openvpn3.Session, warmup: BackendWarmup,
+                         spinner: SpinnerWindow, creds: UserCreds) -> Tuple[bool, str]:
+        error_msg = None
+        if warmup.needs_creds:
+            # The backend is already waiting for credentials, send them right away
+            error_msg = self.__provide_user_creds(session, creds)
+        else:
+            # The user was faster than the backend, finish waiting for it to settle
+            while warmup.settle_time_left() > 0:
+                time.sleep(0.1)
+                self.flush_gtk_events()
+
         # Start VPN connection
         ready = False
-        error_msg = None
         while not ready and not error_msg:
             try:
                 # Is the backend ready to connect?  If not an exception is thrown
-                session.Ready()
-                session.Connect()
+                with METRICS.dbus_call("Ready"):
+                    session.Ready()
+                with METRICS.dbus_call("Connect"):
+                    session.Connect()
                 ready = True
             except dbus.exceptions.DBusException as e:
                 if str(e).find('Backend VPN process is not ready') > 0:
@@ -536,12 +1758,28 @@ class AppWindow(Gtk.ApplicationWindow):
                 time.sleep(0.1)
                 self.flush_gtk_events()
 
-        # Perform cleanup
         # Session manager is still trying to establish the session in the background
         # So we need to explicitly terminate it
+        self.__terminate_session(session)
+
+        return False, error_msg
+
+    def __discard_session(self, session: openvpn3.Session):
+        """ Disconnect a session the user has not tried to connect yet.
+            The backend may have dropped it already, so errors are not fatal.
+        """
+        try:
+            with METRICS.dbus_call("Disconnect"):
+                session.Disconnect()
+        except dbus.exceptions.DBusException as e:
+            print("Failed to disconnect session", session.GetPath(), e.get_dbus_message())
+
+    def __terminate_session(self, session: openvpn3.Session):
+        """ Perform cleanup of a session that did not get connected. """
         # Unfortunately, sometimes OpenVPN3 v21 segfaults here :(
         try:
-            session.Disconnect()
+            with METRICS.dbus_call("Disconnect"):
+                session.Disconnect()
         except Exception:
             self.display_error("Fatal error",
                 "Unexpected error occurred. This is typically caused by backend error,\n"
@@ -549,25 +1787,19 @@ class AppWindow(Gtk.ApplicationWindow):
                 "Session data may be inconsistent, the application will exit now.")
             sys.exit(1)
 
-        return False, error_msg
-
     def __disconnect_vpn(self, config):
         s_path = config["session_path"]
         if s_path is None:
             return
         session = self.smgr.Retrieve(s_path)
-        session.Disconnect()
+        with METRICS.dbus_call("Disconnect"):
+            session.Disconnect()
 
     def __new_session(self, config_path: str) -> openvpn3.Session:
         cfg = self.cmgr.Retrieve(config_path)
-        session = self.smgr.NewTunnel(cfg)
-
-        # Wait for the backend to settle
-        for _ in range(0, 10):
-            time.sleep(0.1)
-            self.flush_gtk_events()
-
-        return session
+        # The backend needs some time to settle, see BackendWarmup
+        with METRICS.dbus_call("NewTunnel"):
+            return self.smgr.NewTunnel(cfg)
 
     def __provide_user_creds(self, session: openvpn3.Session, creds: UserCreds) -> str:
         """ Provide credentials to the backend. Try and return user-friendly
@@ -610,7 +1842,8 @@ class AppWindow(Gtk.ApplicationWindow):
         """
         for i in range(1, seconds*10):
             if i % 10 == 0:
-                status = session.GetStatus()
+                with METRICS.dbus_call("GetStatus"):
+                    status = session.GetStatus()
                 if (status["major"] == StatusMajor.CONNECTION and
                     status["minor"] == StatusMinor.CONN_CONNECTED):
                     return True, None
@@ -624,7 +1857,7 @@ class AppWindow(Gtk.ApplicationWindow):
                     status["minor"] == StatusMinor.CONN_AUTH_FAILED):
                     error_msg = "Authentication failed"
                     break
-                print(f"[{i}] Status:", str(session.GetStatus()))
+                print(f"[{i}] Status:", str(status))
             self.flush_gtk_events()
             time.sleep(0.1)
             if spinner.cancelled_by_user:
@@ -637,6 +1870,53 @@ class AppWindow(Gtk.ApplicationWindow):
                 error_msg += "\nMessage: " + status["message"]
         return False, error_msg
 
+    def on_selftest_clicked(self, button: Gtk.Button, config):
+        """ Run the tunnel self-test in a worker thread. """
+        self.idle_counter = 0
+        endpoint = os.environ.get(SELFTEST_ENDPOINT_ENV)
+        if not endpoint or ":" not in endpoint:
+            self.display_error("Self-test is not configured",
+                               f"Set {SELFTEST_ENDPOINT_ENV}=host:port to an endpoint running\n"
+                               "a TCP sink and a UDP echo service behind the VPN.")
+            return
+        host, port = endpoint.rsplit(":", 1)
+        host = host.strip("[]")
+        self.connect_dbus()
+        try:
+            device = self.smgr.Retrieve(config["session_path"]).GetProperty("device_name")
+        except dbus.exceptions.DBusException as e:
+            self.display_error("Self-test of " + config["config_name"] + " failed",
+                               e.get_dbus_message())
+            return
+        if not device:
+            self.display_error("Self-test of " + config["config_name"] + " failed",
+                               "The tunnel device is not known yet.")
+            return
+        button.set_sensitive(False)
+        self.label_status.set_text(self.label_status.get_text().split("\n")[0] +
+                                   "\nRunning self-test...")
+
+        def worker():
+            try:
+                result, error = format_selftest(run_selftest(host, int(port), str(device))), None
+            except (OSError, ValueError) as e:
+                result, error = None, str(e)
+            GLib.idle_add(self.on_selftest_done, button, config, result, error)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def on_selftest_done(self, button: Gtk.Button, config, result: str, error: str) -> bool:
+        button.set_sensitive(True)
+        status = self.label_status.get_text().split("\n")[0]
+        if error:
+            self.label_status.set_text(status)
+            self.display_error("Self-test of " + config["config_name"] + " failed", error)
+        else:
+            print("Self-test of", config["config_name"] + ":", result)
+            self.selftest_results[config["session_path"]] = result
+            self.label_status.set_text(status + "\n" + result)
+        return False
+
     def on_add_profile_clicked(self, _widget: Gtk.Button):
         self.idle_counter = 0
         dialog = Gtk.FileChooserDialog(title="Import VPN Profile",
@@ -676,13 +1956,8 @@ class AppWindow(Gtk.ApplicationWindow):
         dialog.add_filter(filter_any)
 
     def __is_valid_profile(self, filename: str) -> bool:
-        """ Sanity check of the OpenVPN profile. """
-        # OpenVPN3 does not perform any profile validation and allows
-        # to import arbitrary data, so we have to do some minimal check
         with open(filename, 'r', encoding="utf-8") as f:
-            if "remote" in f.read():
-                return True
-        return False
+            return is_valid_profile(f.read())
 
     def __import_profile(self, filename: str):
         profile_name = os.path.splitext(os.path.basename(filename))[0]
@@ -731,7 +2006,8 @@ class Application(Gtk.Application):
         if self.gnome_dark_mode_enabled():
             self.set_gtk_application_prefer_dark_theme(True)
 
-        actions = ("import_profile", "about", "view_log", "quit")
+        actions = ("import_profile", "about", "view_log", "view_timings",
+                   "export_timings", "quit")
 
         for action_name in actions:
             action = Gio.SimpleAction.new(action_name, None)
@@ -746,6 +2022,17 @@ class Application(Gtk.Application):
         self.add_action(action)
 
         self.rotate_log()
+        self.start_metrics_exporter()
+
+    def start_metrics_exporter(self):
+        """ Enable the metrics exporter if it is configured in the environment. """
+        METRICS.enabled = bool(os.environ.get(METRICS_FILE_ENV) or os.environ.get(METRICS_PORT_ENV))
+        port = os.environ.get(METRICS_PORT_ENV)
+        if port:
+            try:
+                METRICS.serve(int(port))
+            except (ValueError, OSError) as e:
+                print("Failed to start metrics endpoint:", e)
 
     def do_activate(self, *args, **kwargs):
         # We only allow a single window and raise any existing ones
@@ -796,6 +2083,78 @@ class Application(Gtk.Application):
         if self.window:
             self.window.on_add_profile_clicked(None)
 
+    def log_generations(self) -> list:
+        """ Existing log files, oldest first. """
+        return [f for f in (self.old_log_filename, self.log_filename) if os.path.exists(f)]
+
+    def on_view_timings(self, _action: Gio.SimpleAction, _param: None):
+        """ Handle "Connection Timings" menu command. The log is parsed in
+            a worker thread, it can take a while for a big log.
+        """
+        logs = self.log_generations()
+        if not logs:
+            self.window.display_error("Log is empty", "There are no records in the log yet")
+            return
+
+        def worker():
+            try:
+                text = "".join(format_timeline(t)
+                               for t in connect_timelines(parse_log_events(logs)))
+                error = None
+            except OSError as e:
+                text, error = None, str(e)
+            GLib.idle_add(self.__show_timings, text, error)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def __show_timings(self, text: str, error: str) -> bool:
+        if error:
+            self.window.display_error("Failed to read the log", error)
+        else:
+            win = TextFileWindow("Connection Timings",
+                                 text or "No connection attempts in the log")
+            win.show_all()
+        return False
+
+    def on_export_timings(self, _action: Gio.SimpleAction, _param: None):
+        """ Handle "Export Timings" menu command. Attempts are written to
+            the JSON file one by one to keep memory usage bounded,
+            in a worker thread to keep the UI responsive.
+        """
+        logs = self.log_generations()
+        if not logs:
+            self.window.display_error("Log is empty", "There are no records in the log yet")
+            return
+        dialog = Gtk.FileChooserDialog(title="Export Connection Timings",
+                                       parent=self.window,
+                                       action=Gtk.FileChooserAction.SAVE)
+        dialog.add_buttons(Gtk.STOCK_CANCEL, Gtk.ResponseType.CANCEL,
+                           Gtk.STOCK_SAVE, Gtk.ResponseType.OK)
+        dialog.set_do_overwrite_confirmation(True)
+        dialog.set_current_name("ovpn3gui-timings.json")
+        response = dialog.run()
+        filename = dialog.get_filename()
+        dialog.destroy()
+        if response != Gtk.ResponseType.OK:
+            return
+
+        def worker():
+            try:
+                with open(filename, 'w', encoding="utf-8") as f:
+                    f.write("[")
+                    for i, t in enumerate(connect_timelines(parse_log_events(logs))):
+                        f.write(",\n" if i else "\n")
+                        json.dump(t, f)
+                    f.write("\n]\n")
+            except OSError as e:
+                GLib.idle_add(self.__export_failed, str(e))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def __export_failed(self, error: str) -> bool:
+        self.window.display_error("Failed to export connection timings", error)
+        return False
+
     def on_view_log(self, _action: Gio.SimpleAction, _param: None):
         """ Handle "View Log" menu command. """
         log = None
@@ -837,6 +2196,8 @@ if __name__ == "__main__":
     # Set up the main GLib loop and connect to the system bus
     mainloop = GLib.MainLoop()
     dbusloop = DBusGMainLoop(set_as_default=True)
+    # D-Bus is also used from the session cleanup threads
+    threads_init()
     sysbus = dbus.SystemBus(mainloop=dbusloop)
 
     app = Application()